@@ -2,13 +2,14 @@
 Bio Age Coach - Streamlit App
 """
 
+import io
 import os
+import logging
 import streamlit as st
-import matplotlib.pyplot as plt
-import numpy as np
+import altair as alt
 import json
 from src.chatbot.coach import BioAgeCoach
-from src.database.db_connector import DatabaseConnector, initialize_coach_with_user_data
+from src.database.db_connector import DatabaseConnector, average_daily_health, initialize_coach_with_user_data
 from src.database.init_db import init_database
 from dotenv import load_dotenv
 import datetime
@@ -19,21 +20,25 @@ st.set_page_config(page_title="Bio Age Coach", page_icon="🧬", layout="wide")
 # Load environment variables
 load_dotenv()
 
-# Ensure data directory exists
-if not os.path.exists("data"):
-    os.makedirs("data")
+# Select matplotlib's non-interactive Agg backend once, for the lazy chart import
+# and any dependency that pulls in pyplot (an explicit MPLBACKEND still wins)
+os.environ.setdefault("MPLBACKEND", "Agg")
 
-# Initialize database if it doesn't exist
-db_path = "data/test_database.db"
-if not os.path.exists(db_path):
-    try:
-        # Ensure data directory exists
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
-        # Initialize database with sample data
-        init_database(db_path)
-        print("Database initialized successfully")  # Use print instead of st.toast for initialization
-    except Exception as e:
-        print(f"Error initializing database: {e}")  # Use print instead of st.error for initialization
+# Application debug logging is off unless BIO_AGE_DEBUG=1; only the app's own
+# "src" loggers are configured so Streamlit and libraries keep their logging
+app_logger = logging.getLogger("src")
+if not app_logger.handlers:  # Streamlit re-runs this script on every interaction
+    app_logger.addHandler(logging.StreamHandler())
+    app_logger.propagate = False
+app_logger.setLevel(logging.DEBUG if os.getenv("BIO_AGE_DEBUG") == "1" else logging.WARNING)
+
+# Keyword arguments that make st.image fill its column like st.pyplot does
+# (width="stretch" replaced use_container_width in Streamlit 1.49)
+STRETCH_IMAGE = (
+    {"width": "stretch"}
+    if tuple(int(part) for part in st.__version__.split(".")[:2]) >= (1, 49)
+    else {"use_container_width": True}
+)
 
 # Default biomarkers data
 DEFAULT_BIOMARKERS = {
@@ -68,67 +73,141 @@ DEFAULT_BIOMARKERS = {
     }
 }
 
-# Create biomarkers.json if it doesn't exist
-if not os.path.exists("data/biomarkers.json"):
-    with open("data/biomarkers.json", "w") as f:
-        json.dump(DEFAULT_BIOMARKERS, f, indent=2)
-
-# Create protocols.json if it doesn't exist
-if not os.path.exists("data/protocols.json"):
-    with open("data/protocols.json", "w") as f:
-        json.dump({"protocols": []}, f, indent=2)
-
-# Initialize session state
-if "coach" not in st.session_state:
-    st.session_state.coach = BioAgeCoach()
-
-if "messages" not in st.session_state:
-    st.session_state.messages = []
-
-if "current_category" not in st.session_state:
-    st.session_state.current_category = "health_data"  # Changed default to health_data
-
-if "selected_user_id" not in st.session_state:
-    st.session_state.selected_user_id = None
+# Display unit suffixes for the health profile fields, keyed by category
+UNIT_SUFFIXES = {
+    "health_data": {
+        "active_calories": " kcal",
+        "sleep": " hrs",
+        "resting_heart_rate": " bpm",
+        "blood_pressure_systolic": " mmHg",
+        "blood_pressure_diastolic": " mmHg"
+    },
+    "bio_age_tests": {
+        "push_ups": " reps",
+        "grip_strength": " kg",
+        "one_leg_stand": " sec",
+        "vo2_max": " ml/kg/min"
+    },
+    "biomarkers": {
+        "hdl": " mg/dL",
+        "ldl": " mg/dL",
+        "triglycerides": " mg/dL",
+        "hba1c": "%",
+        "crp": " mg/L",
+        "fasting_glucose": " mg/dL"
+    },
+    "measurements": {
+        "body_fat": "%",
+        "waist_circumference": " cm",
+        "hip_circumference": " cm",
+        "waist_to_hip": " ratio"
+    },
+    "lab_results": {
+        "vitamin_d": " ng/mL"
+    },
+    "capabilities": {
+        "plank": " sec",
+        "sit_and_reach": " cm"
+    }
+}
 
-if "user_data_loaded" not in st.session_state:
-    st.session_state.user_data_loaded = False
+# Location of the SQLite database used by the app
+DB_PATH = "data/test_database.db"
 
-if "db_initialized" not in st.session_state:
-    try:
-        # Connect to the database
-        st.session_state.db = DatabaseConnector(db_path)
-        st.session_state.db_initialized = True
-        
-        # Verify database has users
-        users = st.session_state.db.get_all_users()
-        if not users:
-            # If no users found, try to reinitialize
+@st.cache_resource
+def prepare_data_files(db_path):
+    """
+    Create the data directory, sample database and default JSON files.
+    
+    Cached as a resource so the filesystem checks run once per server process
+    instead of on every script rerun.
+    """
+    # Ensure data directory exists
+    os.makedirs("data", exist_ok=True)
+    
+    # Initialize database if it doesn't exist
+    if not os.path.exists(db_path):
+        try:
+            # Ensure data directory exists
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+            # Initialize database with sample data
             init_database(db_path)
-            print("Database reinitialized successfully")  # Use print instead of st.toast for initialization
-            # Reconnect to the database
-            st.session_state.db = DatabaseConnector(db_path)
-    except Exception as e:
-        st.session_state.db_initialized = False
-        print(f"Database connection error: {e}")  # Use print instead of st.error for initialization
+            print("Database initialized successfully")  # Use print instead of st.toast for initialization
+        except Exception as e:
+            print(f"Error initializing database: {e}")  # Use print instead of st.error for initialization
+    
+    # Create biomarkers.json if it doesn't exist
+    if not os.path.exists("data/biomarkers.json"):
+        with open("data/biomarkers.json", "w") as f:
+            json.dump(DEFAULT_BIOMARKERS, f, indent=2)
+    
+    # Create protocols.json if it doesn't exist
+    if not os.path.exists("data/protocols.json"):
+        with open("data/protocols.json", "w") as f:
+            json.dump({"protocols": []}, f, indent=2)
 
-# Initialize category options
-if "category_options" not in st.session_state:
-    st.session_state.category_options = {}
-    try:
-        for category_key, category_data in st.session_state.coach.biomarkers.get("categories", {}).items():
-            st.session_state.category_options[category_key] = category_data.get("display_name", category_key)
-    except Exception as e:
-        # Fallback to default categories if there's an error
-        st.session_state.category_options = {
-            "health_data": "Daily Health Data",
-            "bio_age_tests": "Bio-Age Tests",
-            "biomarkers": "Biomarkers"
-        }
-        st.warning("Using default categories due to missing or invalid biomarkers data.")
+prepare_data_files(DB_PATH)
+
+def init_session_state():
+    """
+    Initialize the session state variables and the database connection.
+    
+    Every key is only set when missing, so this is cheap on reruns.
+    """
+    if "coach" not in st.session_state:
+        st.session_state.coach = BioAgeCoach()
+    
+    if "messages" not in st.session_state:
+        st.session_state.messages = []
+    
+    if "current_category" not in st.session_state:
+        st.session_state.current_category = "health_data"  # Changed default to health_data
+    
+    if "selected_user_id" not in st.session_state:
+        st.session_state.selected_user_id = None
+    
+    if "user_data_loaded" not in st.session_state:
+        st.session_state.user_data_loaded = False
+    
+    if "db_initialized" not in st.session_state:
+        try:
+            # Connect to the database
+            st.session_state.db = DatabaseConnector(DB_PATH)
+            st.session_state.db_initialized = True
+            
+            # Verify database has users
+            users = st.session_state.db.get_all_users()
+            if not users:
+                # If no users found, try to reinitialize
+                init_database(DB_PATH)
+                print("Database reinitialized successfully")  # Use print instead of st.toast for initialization
+                # Reconnect to the database
+                st.session_state.db = DatabaseConnector(DB_PATH)
+        except Exception as e:
+            st.session_state.db_initialized = False
+            print(f"Database connection error: {e}")  # Use print instead of st.error for initialization
+    
+    # Initialize category options
+    if "category_options" not in st.session_state:
+        st.session_state.category_options = {}
+        try:
+            for category_key, category_data in st.session_state.coach.biomarkers.get("categories", {}).items():
+                st.session_state.category_options[category_key] = category_data.get("display_name", category_key)
+        except Exception as e:
+            # Fallback to default categories if there's an error
+            st.session_state.category_options = {
+                "health_data": "Daily Health Data",
+                "bio_age_tests": "Bio-Age Tests",
+                "biomarkers": "Biomarkers"
+            }
+            st.warning("Using default categories due to missing or invalid biomarkers data.")
 
 def draw_completeness_chart(completeness_data):
     """Draw a radar chart showing data completeness across categories."""
+    # Import the plotting stack on first use so it doesn't slow down app start-up
+    import numpy as np
+    from matplotlib.figure import Figure
+    
     categories = list(completeness_data.keys())
     values = list(completeness_data.values())
     
@@ -143,11 +222,13 @@ def draw_completeness_chart(completeness_data):
     angles.append(angles[0])
     categories.append(categories[0])
     
-    # Create the plot
-    fig, ax = plt.subplots(figsize=(5, 5), subplot_kw=dict(polar=True))
+    # Create the plot without pyplot so no figure is left in its global registry
+    fig = Figure(figsize=(5, 5))
+    ax = fig.add_subplot(polar=True)
     
     # Draw one axis per variable and add labels
-    plt.xticks(angles[:-1], categories[:-1], color='grey', size=8)
+    ax.set_xticks(angles[:-1])
+    ax.set_xticklabels(categories[:-1], color='grey', size=8)
     
     # Draw the chart
     ax.plot(angles, values, linewidth=2, linestyle='solid')
@@ -161,10 +242,18 @@ def draw_completeness_chart(completeness_data):
     ax.set_yticklabels(['25%', '50%', '75%', '100%'], fontsize=7)  # Set labels
     
     # Add a title
-    plt.title('Health Data Completeness', size=11)
+    ax.set_title('Health Data Completeness', size=11)
     
     return fig
 
+@st.cache_data(max_entries=32)
+def render_completeness_chart(completeness_data):
+    """Render the completeness radar chart to PNG bytes, cached by its data."""
+    fig = draw_completeness_chart(completeness_data)
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=200, bbox_inches="tight")
+    return buffer.getvalue()
+
 def load_user_data(user_id):
     """Load user data from the database into the coach."""
     if not st.session_state.db_initialized:
@@ -211,7 +300,12 @@ def load_user_data(user_id):
         return False
 
 def get_daily_health_summary(user_id):
-    """Get a summary of the user's daily health metrics from the database."""
+    """
+    Get a summary of the user's daily health metrics from the database.
+    
+    The raw records are returned alongside the averages under "records" so
+    callers that also plot the data don't need a second query.
+    """
     if not st.session_state.db_initialized:
         return None
     
@@ -223,19 +317,17 @@ def get_daily_health_summary(user_id):
             return None
         
         # Calculate averages
-        avg_calories = sum(d['active_calories'] for d in daily_data) / len(daily_data)
-        avg_steps = sum(d['steps'] for d in daily_data) / len(daily_data)
-        avg_sleep = sum(d['sleep_hours'] for d in daily_data) / len(daily_data)
-        avg_score = sum(d['daily_score'] for d in daily_data) / len(daily_data)
+        averages = average_daily_health(daily_data)
         
         # Create a summary
         summary = {
-            "avg_calories": round(avg_calories, 1),
-            "avg_steps": round(avg_steps, 0),
-            "avg_sleep": round(avg_sleep, 1),
-            "avg_score": round(avg_score, 1),
+            "avg_calories": averages["active_calories"],
+            "avg_steps": averages["steps"],
+            "avg_sleep": averages["sleep_hours"],
+            "avg_score": averages["daily_score"],
             "days": len(daily_data),
-            "latest_date": daily_data[0]['date'] if daily_data else None
+            "latest_date": daily_data[0]['date'] if daily_data else None,
+            "records": daily_data
         }
         
         return summary
@@ -247,6 +339,9 @@ def display_health_data_profile(coach):
     """
     Display the user's health data profile in the sidebar as context for the chat.
     
+    Each section is collected into a list of lines and emitted with a single
+    st.markdown call, rather than one element per field.
+    
     Args:
         coach: The Bio-Age Coach instance with loaded user data
     """
@@ -275,12 +370,12 @@ def display_health_data_profile(coach):
                 st.caption(f"Completeness: {completeness}%")
             
             if coach.user_data["health_data"]:
-                st.markdown("#### Available Data")
+                lines = ["#### Available Data"]
                 # First show chronological age and biological sex if available
                 if "chronological_age" in coach.user_data["health_data"]:
-                    st.markdown(f"✅ **Age:** {coach.user_data['health_data']['chronological_age']} years")
+                    lines.append(f"✅ **Age:** {coach.user_data['health_data']['chronological_age']} years")
                 if "biological_sex" in coach.user_data["health_data"]:
-                    st.markdown(f"✅ **Biological Sex:** {coach.user_data['health_data']['biological_sex'].capitalize()}")
+                    lines.append(f"✅ **Biological Sex:** {coach.user_data['health_data']['biological_sex'].capitalize()}")
                 
                 # Then show other health data
                 for key, value in coach.user_data["health_data"].items():
@@ -292,18 +387,11 @@ def display_health_data_profile(coach):
                     display_name = " ".join(word.capitalize() for word in key.split('_'))
                     
                     # Add units where appropriate
-                    units = ""
-                    if "calories" in key:
-                        units = " kcal"
-                    elif key == "sleep":
-                        units = " hrs"
-                    elif "heart_rate" in key:
-                        units = " bpm"
-                    elif "pressure" in key:
-                        units = " mmHg"
+                    units = UNIT_SUFFIXES["health_data"].get(key, "")
                     
                     # Display the value with a green indicator
-                    st.markdown(f"✅ **{display_name}:** {value}{units}")
+                    lines.append(f"✅ **{display_name}:** {value}{units}")
+                st.markdown("\n\n".join(lines))
             
             # Show missing fields
             missing_fields = []
@@ -312,7 +400,7 @@ def display_health_data_profile(coach):
                     missing_fields.append(field)
                     
             if missing_fields:
-                st.markdown("#### Missing Data")
+                lines = ["#### Missing Data"]
                 for field in missing_fields:
                     # Get display name from biomarkers definition
                     display_name = field
@@ -322,7 +410,8 @@ def display_health_data_profile(coach):
                             break
                     
                     # Display as missing with a red indicator
-                    st.markdown(f"❌ **{display_name}**")
+                    lines.append(f"❌ **{display_name}**")
+                st.markdown("\n\n".join(lines))
             
             if not coach.user_data["health_data"] and not missing_fields:
                 st.caption("No daily health data available")
@@ -338,29 +427,22 @@ def display_health_data_profile(coach):
                 st.caption(f"Completeness: {completeness}%")
             
             if coach.user_data["bio_age_tests"]:
-                st.markdown("#### Available Tests")
+                lines = ["#### Available Tests"]
                 for key, value in coach.user_data["bio_age_tests"].items():
                     # Format the display name
                     display_name = " ".join(word.capitalize() for word in key.split('_'))
                     
                     # Add units where appropriate
-                    units = ""
-                    if key == "push_ups":
-                        units = " reps"
-                    elif key == "grip_strength":
-                        units = " kg"
-                    elif key == "one_leg_stand":
-                        units = " sec"
-                    elif key == "vo2_max":
-                        units = " ml/kg/min"
+                    units = UNIT_SUFFIXES["bio_age_tests"].get(key, "")
                     
                     # Display the value with a green indicator
-                    st.markdown(f"✅ **{display_name}:** {value}{units}")
+                    lines.append(f"✅ **{display_name}:** {value}{units}")
+                st.markdown("\n\n".join(lines))
             
             # Show missing fields
             missing_fields = [field for field in bio_test_fields if field not in available_fields]
             if missing_fields:
-                st.markdown("#### Missing Tests")
+                lines = ["#### Missing Tests"]
                 for field in missing_fields:
                     # Get display name from biomarkers definition
                     display_name = field
@@ -370,7 +452,8 @@ def display_health_data_profile(coach):
                             break
                     
                     # Display as missing with a red indicator
-                    st.markdown(f"❌ **{display_name}**")
+                    lines.append(f"❌ **{display_name}**")
+                st.markdown("\n\n".join(lines))
             
             if not coach.user_data["bio_age_tests"] and not missing_fields:
                 st.caption("No bio-age test data available")
@@ -386,29 +469,22 @@ def display_health_data_profile(coach):
                 st.caption(f"Completeness: {completeness}%")
             
             if coach.user_data["biomarkers"]:
-                st.markdown("#### Available Biomarkers")
+                lines = ["#### Available Biomarkers"]
                 for key, value in coach.user_data["biomarkers"].items():
                     # Format the display name
                     display_name = key.upper() if len(key) <= 3 else " ".join(word.capitalize() for word in key.split('_'))
                     
                     # Add units where appropriate
-                    units = ""
-                    if key in ["hdl", "ldl", "triglycerides"]:
-                        units = " mg/dL"
-                    elif key == "hba1c":
-                        units = "%"
-                    elif key == "crp":
-                        units = " mg/L"
-                    elif key == "fasting_glucose":
-                        units = " mg/dL"
+                    units = UNIT_SUFFIXES["biomarkers"].get(key, "")
                     
                     # Display the value with a green indicator
-                    st.markdown(f"✅ **{display_name}:** {value}{units}")
+                    lines.append(f"✅ **{display_name}:** {value}{units}")
+                st.markdown("\n\n".join(lines))
             
             # Show missing fields
             missing_fields = [field for field in biomarker_fields if field not in available_fields]
             if missing_fields:
-                st.markdown("#### Missing Biomarkers")
+                lines = ["#### Missing Biomarkers"]
                 for field in missing_fields:
                     # Get display name from biomarkers definition
                     display_name = field.upper() if len(field) <= 3 else " ".join(word.capitalize() for word in field.split('_'))
@@ -418,7 +494,8 @@ def display_health_data_profile(coach):
                             break
                     
                     # Display as missing with a red indicator
-                    st.markdown(f"❌ **{display_name}**")
+                    lines.append(f"❌ **{display_name}**")
+                st.markdown("\n\n".join(lines))
             
             if not coach.user_data["biomarkers"] and not missing_fields:
                 st.caption("No biomarker data available")
@@ -434,27 +511,22 @@ def display_health_data_profile(coach):
                 st.caption(f"Completeness: {completeness}%")
             
             if coach.user_data["measurements"]:
-                st.markdown("#### Available Measurements")
+                lines = ["#### Available Measurements"]
                 for key, value in coach.user_data["measurements"].items():
                     # Format the display name
                     display_name = " ".join(word.capitalize() for word in key.split('_'))
                     
                     # Add units where appropriate
-                    units = ""
-                    if key == "body_fat":
-                        units = "%"
-                    elif key in ["waist_circumference", "hip_circumference"]:
-                        units = " cm"
-                    elif key == "waist_to_hip":
-                        units = " ratio"
+                    units = UNIT_SUFFIXES["measurements"].get(key, "")
                     
                     # Display the value with a green indicator
-                    st.markdown(f"✅ **{display_name}:** {value}{units}")
+                    lines.append(f"✅ **{display_name}:** {value}{units}")
+                st.markdown("\n\n".join(lines))
             
             # Show missing fields
             missing_fields = [field for field in measurement_fields if field not in available_fields]
             if missing_fields:
-                st.markdown("#### Missing Measurements")
+                lines = ["#### Missing Measurements"]
                 for field in missing_fields:
                     # Get display name from biomarkers definition
                     display_name = " ".join(word.capitalize() for word in field.split('_'))
@@ -464,7 +536,8 @@ def display_health_data_profile(coach):
                             break
                     
                     # Display as missing with a red indicator
-                    st.markdown(f"❌ **{display_name}**")
+                    lines.append(f"❌ **{display_name}**")
+                st.markdown("\n\n".join(lines))
             
             if not coach.user_data["measurements"] and not missing_fields:
                 st.caption("No measurement data available")
@@ -490,21 +563,20 @@ def display_health_data_profile(coach):
             
             # Lab Results
             if coach.user_data["lab_results"]:
-                st.markdown("#### Available Lab Results")
+                lines = ["#### Available Lab Results"]
                 for key, value in coach.user_data["lab_results"].items():
                     display_name = " ".join(word.capitalize() for word in key.split('_'))
                     
                     # Add units where appropriate
-                    units = ""
-                    if key == "vitamin_d":
-                        units = " ng/mL"
+                    units = UNIT_SUFFIXES["lab_results"].get(key, "")
                     
-                    st.markdown(f"✅ **{display_name}:** {value}{units}")
+                    lines.append(f"✅ **{display_name}:** {value}{units}")
+                st.markdown("\n\n".join(lines))
             
             # Show missing lab fields
             missing_lab_fields = [field for field in lab_fields if field not in available_lab_fields]
             if missing_lab_fields:
-                st.markdown("#### Missing Lab Results")
+                lines = ["#### Missing Lab Results"]
                 for field in missing_lab_fields:
                     # Get display name
                     display_name = " ".join(word.capitalize() for word in field.split('_'))
@@ -513,27 +585,25 @@ def display_health_data_profile(coach):
                             display_name = item["name"]
                             break
                     
-                    st.markdown(f"❌ **{display_name}**")
+                    lines.append(f"❌ **{display_name}**")
+                st.markdown("\n\n".join(lines))
             
             # Capabilities
             if coach.user_data["capabilities"]:
-                st.markdown("#### Available Capabilities")
+                lines = ["#### Available Capabilities"]
                 for key, value in coach.user_data["capabilities"].items():
                     display_name = " ".join(word.capitalize() for word in key.split('_'))
                     
                     # Add units where appropriate
-                    units = ""
-                    if key == "plank":
-                        units = " sec"
-                    elif key == "sit_and_reach":
-                        units = " cm"
+                    units = UNIT_SUFFIXES["capabilities"].get(key, "")
                     
-                    st.markdown(f"✅ **{display_name}:** {value}{units}")
+                    lines.append(f"✅ **{display_name}:** {value}{units}")
+                st.markdown("\n\n".join(lines))
             
             # Show missing capability fields
             missing_capability_fields = [field for field in capability_fields if field not in available_capability_fields]
             if missing_capability_fields:
-                st.markdown("#### Missing Capabilities")
+                lines = ["#### Missing Capabilities"]
                 for field in missing_capability_fields:
                     # Get display name
                     display_name = " ".join(word.capitalize() for word in field.split('_'))
@@ -542,7 +612,8 @@ def display_health_data_profile(coach):
                             display_name = item["name"]
                             break
                     
-                    st.markdown(f"❌ **{display_name}**")
+                    lines.append(f"❌ **{display_name}**")
+                st.markdown("\n\n".join(lines))
             
             if not coach.user_data["lab_results"] and not coach.user_data["capabilities"] and not missing_lab_fields and not missing_capability_fields:
                 st.caption("No additional data available")
@@ -576,8 +647,8 @@ def show_completeness_indicators():
     # Show radar chart if we have data in at least one category
     if overall > 0:
         st.write("---")
-        radar_chart = draw_completeness_chart(completeness_data)
-        st.pyplot(radar_chart)
+        # Identical completeness data reuses the cached image instead of redrawing
+        st.image(render_completeness_chart(completeness_data), **STRETCH_IMAGE)
     
     # Suggest next measurements
     if overall < 0.8:  # Only show suggestions if profile is less than 80% complete
@@ -616,91 +687,40 @@ def show_daily_health_dashboard(user_id):
     with col4:
         st.metric("Avg. Health Score", f"{summary['avg_score']}/100")
     
-    # Get the data for plotting
+    # Plot the records that were already fetched for the summary
     try:
-        daily_data = st.session_state.db.get_daily_health_data(user_id, limit=14)
+        daily_data = summary["records"]
         
         if daily_data:
             # Reverse to get chronological order
-            daily_data.reverse()
-            
-            # Extract data for plotting
-            dates = [d['date'] for d in daily_data]
-            scores = [d['daily_score'] for d in daily_data]
-            
-            # Create a simple line chart
-            fig, ax = plt.subplots(figsize=(10, 3))
-            ax.plot(dates, scores, marker='o', linestyle='-', color='#1f77b4')
-            ax.set_title('Daily Health Scores')
-            ax.set_ylabel('Score (0-100)')
-            ax.set_ylim(0, 100)
-            ax.grid(True, linestyle='--', alpha=0.7)
-            
-            # Rotate date labels for better readability
-            plt.xticks(rotation=45)
-            plt.tight_layout()
-            
-            st.pyplot(fig)
+            daily_data = daily_data[::-1]
+            
+            # Build a Vega-Lite line chart; it is rendered in the browser, so no
+            # image is rasterized on the server
+            values = [{"date": d['date'], "score": d['daily_score']} for d in daily_data]
+            chart = alt.Chart(alt.Data(values=values)).mark_line(point=True).encode(
+                x=alt.X("date:T", title=None),
+                y=alt.Y("score:Q", title="Score (0-100)", scale=alt.Scale(domain=[0, 100])),
+                tooltip=["date:T", "score:Q"]
+            ).properties(title="Daily Health Scores", height=250)
+            
+            # Streamlit fills the container width by default for a single chart
+            st.altair_chart(chart)
     except Exception as e:
         st.error(f"Error plotting daily health data: {e}")
 
 def main():
     """Main function to run the Bio Age Coach."""
     # Initialize all session state variables at the start
-    if "coach" not in st.session_state:
-        st.session_state.coach = BioAgeCoach()
-    
-    if "messages" not in st.session_state:
-        st.session_state.messages = []
-    
-    if "current_category" not in st.session_state:
-        st.session_state.current_category = "health_data"
-    
-    if "selected_user_id" not in st.session_state:
-        st.session_state.selected_user_id = None
-    
-    if "user_data_loaded" not in st.session_state:
-        st.session_state.user_data_loaded = False
-    
-    if "category_options" not in st.session_state:
-        st.session_state.category_options = {}
-        for category_key, category_data in st.session_state.coach.biomarkers.get("categories", {}).items():
-            st.session_state.category_options[category_key] = category_data.get("display_name", category_key)
+    init_session_state()
     
     # Main layout
     st.sidebar.title("🧬 Bio Age Coach")
     
-    # Initialize database connector if not already done
-    if "db_initialized" not in st.session_state:
-        try:
-            db_path = "data/test_database.db"
-            # Try to initialize the database if it doesn't exist
-            if not os.path.exists(db_path):
-                init_database(db_path)
-                print("Database initialized successfully")  # Use print instead of st.toast for initialization
-            
-            # Connect to the database
-            st.session_state.db = DatabaseConnector(db_path)
-            st.session_state.db_initialized = True
-            
-            # Verify database has users
-            users = st.session_state.db.get_all_users()
-            if not users:
-                # If no users found, try to reinitialize
-                init_database(db_path)
-                print("Database reinitialized successfully")  # Use print instead of st.toast for initialization
-        except Exception as e:
-            st.session_state.db_initialized = False
-            print(f"Database initialization failed: {str(e)}")  # Use print instead of st.error for initialization
-            st.info("Please check the application logs for more details.")
-    
     # Add database initialization section in sidebar
     with st.sidebar.expander("⚙️ Database Management", expanded=False):
         st.caption("Initialize or reset the database with sample data.")
         
-        # Define db_path here so it's available in the button callback
-        db_path = "data/test_database.db"
-        
         # Show current database status
         if st.session_state.db_initialized:
             st.success("Database is initialized and connected")
@@ -726,8 +746,8 @@ def main():
                         del st.session_state.db
                     
                     # Remove the database file
-                    if os.path.exists(db_path):
-                        os.remove(db_path)
+                    if os.path.exists(DB_PATH):
+                        os.remove(DB_PATH)
                         st.session_state.db_initialized = False
                         st.success("Database deleted successfully")
                         st.rerun()
@@ -738,13 +758,13 @@ def main():
             if st.button("🔄 Reinitialize"):
                 try:
                     # Ensure the data directory exists
-                    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+                    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
                     
                     # Initialize the database
-                    init_database(db_path)
+                    init_database(DB_PATH)
                     
                     # Reconnect to the database
-                    st.session_state.db = DatabaseConnector(db_path)
+                    st.session_state.db = DatabaseConnector(DB_PATH)
                     st.session_state.db_initialized = True
                     
                     # Verify the database has users
@@ -766,14 +786,18 @@ def main():
         default_username = f"user_{datetime.datetime.now().strftime('%m%d_%H%M')}"
         default_email = f"{default_username}@example.com"
         
-        # Input fields for new user with defaults
-        new_username = st.text_input("Username", value=default_username, help="Change if desired, or use default generated username")
-        new_email = st.text_input("Email", value=default_email, help="Change if desired, or use default generated email")
-        target_completion = st.slider("Target Data Completion %", min_value=0, max_value=100, value=80, step=10, 
-                                    help="This will evenly distribute data across all health categories")
+        # Input fields for new user with defaults, grouped in a form so editing
+        # them doesn't rerun the whole script until the user is submitted
+        with st.form(key="create_sample_user_form"):
+            new_username = st.text_input("Username", value=default_username, help="Change if desired, or use default generated username")
+            new_email = st.text_input("Email", value=default_email, help="Change if desired, or use default generated email")
+            target_completion = st.slider("Target Data Completion %", min_value=0, max_value=100, value=80, step=10, 
+                                        help="This will evenly distribute data across all health categories")
+            
+            # Add button to create user
+            create_user_submitted = st.form_submit_button("Create Sample User")
         
-        # Add button to create user
-        if st.button("Create Sample User"):
+        if create_user_submitted:
             try:
                 # Create new user in database
                 new_user = {
@@ -807,11 +831,11 @@ def main():
                 index=0 if st.session_state.selected_user_id in user_options else None
             )
             
-            # Handle user selection change
+            # Handle user selection change. Everything that depends on the loaded
+            # data renders later in this run, so no extra st.rerun() is needed.
             if selected_user != st.session_state.selected_user_id:
                 st.session_state.selected_user_id = selected_user
-                if load_user_data(selected_user):
-                    st.rerun()
+                load_user_data(selected_user)
             
             # Display the user's health data profile in the sidebar when a user is selected
             if st.session_state.selected_user_id:
@@ -824,20 +848,17 @@ def main():
     else:
         st.sidebar.warning("Database not initialized. Using manual data entry mode.")
         
-        # Define db_path here so it's available in the button callback
-        db_path = "data/test_database.db"
-        
         # Add a button to initialize the database directly
         if st.sidebar.button("Generate Test Database"):
             try:
                 # Ensure the data directory exists
-                os.makedirs(os.path.dirname(db_path), exist_ok=True)
+                os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
                 
                 # Initialize the database
-                init_database(db_path)
+                init_database(DB_PATH)
                 
                 # Connect to the database and verify it has users
-                st.session_state.db = DatabaseConnector(db_path)
+                st.session_state.db = DatabaseConnector(DB_PATH)
                 users = st.session_state.db.get_all_users()
                 
                 if users:
@@ -853,8 +874,8 @@ def main():
                 st.sidebar.error("Failed to generate test database")
                 # Try to clean up if database creation failed
                 try:
-                    if os.path.exists(db_path):
-                        os.remove(db_path)
+                    if os.path.exists(DB_PATH):
+                        os.remove(DB_PATH)
                         print("Cleaned up failed database file")  # Use print instead of st.info for cleanup completion
                 except:
                     pass
@@ -945,14 +966,12 @@ def main():
         with st.chat_message("user"):
             st.markdown(user_input)
         
-        # Get response from coach
-        with st.spinner("Thinking..."):
-            response = st.session_state.coach.get_response(user_input)
+        # Stream the coach's response into the chat as it is generated
+        with st.chat_message("assistant"):
+            response = st.write_stream(st.session_state.coach.stream_response(user_input))
         
         # Add assistant message to chat
         st.session_state.messages.append({"role": "assistant", "content": response})
-        with st.chat_message("assistant"):
-            st.markdown(response)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -5,21 +5,55 @@ Bio Age Coach - Setup and Run
 
 import os
 import sys
+import hashlib
 import subprocess
+from pathlib import Path
+from importlib.util import find_spec
 from src.database.init_db import init_database
 
+# Paths are resolved next to this script so it can be launched from any directory
+APP_DIR = Path(__file__).resolve().parent
+REQUIREMENTS_FILE = APP_DIR / "requirements.txt"
+
+# Stamp file recording the hash of the last verified requirements.txt
+REQUIREMENTS_STAMP = APP_DIR / ".req.sha256"
+
+# Top-level modules the app needs (python-dotenv installs as "dotenv")
+REQUIRED_MODULES = ("streamlit", "altair", "matplotlib", "numpy", "openai", "dotenv")
+
 def check_requirements():
-    """Check if all required packages are installed."""
-    try:
-        import streamlit
-        import matplotlib
-        import numpy
-        import openai
-        import python_dotenv
-        return True
-    except ImportError as e:
-        print(f"Missing requirement: {e.name}")
+    """
+    Check if all required packages are installed.
+    
+    Only the import machinery is consulted, so the packages themselves are
+    not imported just to verify that they are present.
+    """
+    missing = [name for name in REQUIRED_MODULES if find_spec(name) is None]
+    for name in missing:
+        print(f"Missing requirement: {name}")
+    return not missing
+
+def requirements_digest():
+    """Return the SHA-256 hex digest of requirements.txt, or None if it is missing."""
+    if not REQUIREMENTS_FILE.exists():
+        return None
+    return hashlib.sha256(REQUIREMENTS_FILE.read_bytes()).hexdigest()
+
+def requirements_up_to_date(digest):
+    """Check whether requirements.txt is unchanged since the last verified setup."""
+    if digest is None:
         return False
+    return REQUIREMENTS_STAMP.exists() and REQUIREMENTS_STAMP.read_text().strip() == digest
+
+def install_requirements():
+    """
+    Install the packages listed in requirements.txt.
+    
+    Returns:
+        pip's return code (0 on success)
+    """
+    result = subprocess.run([sys.executable, "-m", "pip", "install", "-r", str(REQUIREMENTS_FILE)])
+    return result.returncode
 
 def main():
     """Main entry point for the Bio Age Coach application."""
@@ -27,11 +61,22 @@ def main():
     print("   Bio Age Coach - Setup and Run")
     print("=" * 50)
     
-    # Check requirements
-    print("Checking requirements...")
-    if not check_requirements():
-        print("Installing requirements...")
-        subprocess.run([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
+    # The app, its data files and the database are all addressed relative to APP_DIR
+    os.chdir(APP_DIR)
+    
+    # Check requirements, unless requirements.txt hasn't changed since they were last verified
+    # (without a requirements.txt there is nothing to stamp, so they are always checked)
+    digest = requirements_digest()
+    if not requirements_up_to_date(digest):
+        print("Checking requirements...")
+        if not check_requirements():
+            print("Installing requirements...")
+            returncode = install_requirements()
+            if returncode != 0:
+                print(f"Failed to install requirements (pip exited with code {returncode}).")
+                sys.exit(1)
+        if digest is not None:
+            REQUIREMENTS_STAMP.write_text(digest)
     print("Requirements installed successfully!")
     
     # Initialize database with sample data if it doesn't exist
@@ -8,10 +8,10 @@ features of the Bio Age Coach.
 
 import os
 import json
+import argparse
 import sqlite3
-import random
 import datetime
-import math
+import numpy as np
 from typing import Dict, List, Any, Tuple
 
 # Configuration
@@ -23,6 +23,24 @@ SCHEMA_PATH = "data/schema.sql"
 # Ensure the data directory exists
 os.makedirs("data", exist_ok=True)
 
+def calculate_daily_scores(active_calories: np.ndarray, steps: np.ndarray, sleep: np.ndarray) -> np.ndarray:
+    """
+    Calculate daily health scores for arrays of the three core metrics.
+    
+    Args:
+        active_calories: Active calories burned
+        steps: Steps taken
+        sleep: Hours of sleep
+        
+    Returns:
+        Integer array of scores from 0-100, rounded half to even like round()
+    """
+    cal_score = np.minimum(np.asarray(active_calories) / 350 * 10, 10)
+    steps_score = np.minimum(np.asarray(steps) / 3500 * 10, 10)
+    sleep_score = np.minimum(np.asarray(sleep) / 7 * 80, 80)
+    
+    return np.rint(cal_score + steps_score + sleep_score).astype(int)
+
 def calculate_daily_score(active_calories: float, steps: int, sleep: float) -> int:
     """
     Calculate a daily health score based on the three core metrics.
@@ -35,11 +53,58 @@ def calculate_daily_score(active_calories: float, steps: int, sleep: float) -> i
     Returns:
         Score from 0-100
     """
-    cal_score = min(active_calories / 350 * 10, 10)
-    steps_score = min(steps / 3500 * 10, 10)
-    sleep_score = min(sleep / 7 * 80, 80)
+    return int(calculate_daily_scores(active_calories, steps, sleep))
+
+def connect_database() -> sqlite3.Connection:
+    """
+    Open the test database with pragmas tuned for bulk loading.
+    
+    WAL journaling with synchronous=NORMAL only syncs at checkpoints instead of
+    on every commit, which is safe for generated data that can be recreated.
+    
+    Returns:
+        Connection to the test database
+    """
+    conn = sqlite3.connect(DB_PATH)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+def generate_range_values(rng: np.random.Generator, items: List[Dict[str, Any]]) -> List[float]:
+    """
+    Generate one value per item, usually within its normal range.
+    
+    Each value has a 70% chance of falling inside [min, max]; otherwise it lands
+    slightly above or below the range with equal probability, never below zero.
     
-    return round(cal_score + steps_score + sleep_score)
+    Args:
+        rng: Random number generator
+        items: Item definitions with "min" and "max" keys (repeats allowed)
+        
+    Returns:
+        List of values rounded to one decimal place, in the order of items
+    """
+    mins = np.array([item["min"] for item in items], dtype=float)
+    maxs = np.array([item["max"] for item in items], dtype=float)
+    
+    def uniform(low, high):
+        # Like random.uniform, which also accepts high < low (e.g. when min is 0)
+        return low + (high - low) * rng.random(len(items))
+    
+    in_range = rng.random(len(items)) > 0.3  # 70% chance of being in normal range
+    higher = rng.random(len(items)) > 0.5
+    
+    values = np.where(
+        in_range,
+        uniform(mins, maxs),
+        np.where(
+            higher,
+            maxs + uniform(0.1, maxs * 0.2),
+            np.maximum(mins - uniform(0.1, mins * 0.2), 0)  # Ensure no negative values
+        )
+    )
+    return np.round(values, 1).tolist()
 
 def create_database() -> None:
     """Create a new SQLite database and apply the schema."""
@@ -52,7 +117,7 @@ def create_database() -> None:
         create_schema()
     
     # Create the database and apply the schema
-    conn = sqlite3.connect(DB_PATH)
+    conn = connect_database()
     with open(SCHEMA_PATH, 'r') as f:
         schema_sql = f.read()
         conn.executescript(schema_sql)
@@ -127,44 +192,48 @@ def create_schema() -> None:
     
     print(f"Created schema at {SCHEMA_PATH}")
 
-def generate_user_data() -> List[Dict[str, Any]]:
+def generate_user_data(conn: sqlite3.Connection, rng: np.random.Generator) -> List[Dict[str, Any]]:
     """
     Generate random user data and insert it into the database.
     
+    Args:
+        conn: Open connection to the test database
+        rng: Random number generator
+        
     Returns:
         List of user data dictionaries
     """
     users = []
-    conn = sqlite3.connect(DB_PATH)
+    rows = []
     cursor = conn.cursor()
     
+    # Open the transaction explicitly so every insert below is committed together
+    cursor.execute("BEGIN")
+    
     # Common first and last names for generating usernames
     first_names = ["James", "Mary", "John", "Patricia", "Robert", "Jennifer", "Michael", "Linda", "William", "Elizabeth"]
     last_names = ["Smith", "Johnson", "Williams", "Jones", "Brown", "Davis", "Miller", "Wilson", "Moore", "Taylor"]
     
+    today = datetime.date.today()
     for i in range(1, NUM_USERS + 1):
         # Generate user data
-        first_name = random.choice(first_names)
-        last_name = random.choice(last_names)
-        username = f"{first_name.lower()}{last_name.lower()}{random.randint(1, 99)}"
+        first_name = first_names[rng.integers(len(first_names))]
+        last_name = last_names[rng.integers(len(last_names))]
+        username = f"{first_name.lower()}{last_name.lower()}{rng.integers(1, 99, endpoint=True)}"
         email = f"{username}@example.com"
-        date_joined = (datetime.datetime.now() - datetime.timedelta(days=random.randint(30, 365))).strftime("%Y-%m-%d")
-        age = random.randint(25, 65)
-        gender = random.choice(["Male", "Female"])
-        height = round(random.uniform(150, 195), 1)
-        weight = round(random.uniform(50, 100), 1)
+        date_joined = (today - datetime.timedelta(days=int(rng.integers(30, 365, endpoint=True)))).isoformat()
+        age = int(rng.integers(25, 65, endpoint=True))
+        gender = ["Male", "Female"][rng.integers(2)]
+        height = round(rng.uniform(150, 195), 1)
+        weight = round(rng.uniform(50, 100), 1)
         
-        # Insert into database
-        cursor.execute("""
-            INSERT INTO users (username, email, date_joined, age, gender, height, weight)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (username, email, date_joined, age, gender, height, weight))
-        
-        user_id = cursor.lastrowid
+        # Queue the row for the bulk insert; the database is freshly created, so
+        # ids are assigned explicitly instead of reading back lastrowid per row
+        rows.append((i, username, email, date_joined, age, gender, height, weight))
         
         # Add to our list
         users.append({
-            "id": user_id,
+            "id": i,
             "username": username,
             "email": email,
             "date_joined": date_joined,
@@ -174,91 +243,123 @@ def generate_user_data() -> List[Dict[str, Any]]:
             "weight": weight
         })
     
+    # Insert all users in one statement
+    cursor.executemany("""
+        INSERT INTO users (id, username, email, date_joined, age, gender, height, weight)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+    
     conn.commit()
-    conn.close()
     
     print(f"Generated {len(users)} users")
     return users
 
-def generate_daily_health_data(users: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def generate_daily_health_data(conn: sqlite3.Connection, users: List[Dict[str, Any]], rng: np.random.Generator) -> List[Dict[str, Any]]:
     """
     Generate daily health metrics for each user.
     
     Args:
+        conn: Open connection to the test database
         users: List of user data dictionaries
+        rng: Random number generator
         
     Returns:
         List of daily health data dictionaries
     """
     daily_data = []
-    conn = sqlite3.connect(DB_PATH)
+    rows = []
     cursor = conn.cursor()
     
-    for user in users:
+    # Open the transaction explicitly so every insert below is committed together
+    cursor.execute("BEGIN")
+    
+    num_users = len(users)
+    
+    # Generate base metrics with random variation around a typical value,
+    # one row per user
+    base_active_calories = rng.integers(250, 450, size=num_users, endpoint=True)
+    base_steps = rng.integers(3000, 7000, size=num_users, endpoint=True)
+    base_sleep = np.round(rng.uniform(6.0, 8.0, size=num_users), 1)
+    
+    # Calculate the dates once; every user shares the same NUM_DAYS window
+    end_date = datetime.date.today()
+    dates = [end_date - datetime.timedelta(days=day) for day in range(NUM_DAYS)]
+    date_strings = [date.isoformat() for date in dates]
+    
+    # Steps are higher on weekdays, lower on weekends
+    weekend_factor = np.array([0.8 if date.weekday() >= 5 else 1.0 for date in dates])  # Weekend = 0.8x
+    
+    # Add some randomness to the base values for every user and day at once
+    day_multiplier = rng.uniform(0.7, 1.3, size=(num_users, NUM_DAYS))
+    active_calories = np.rint(base_active_calories[:, None] * day_multiplier).astype(int)
+    steps = (base_steps[:, None] * day_multiplier * weekend_factor).astype(int)
+    
+    # Sleep varies less
+    sleep_hours = np.round(base_sleep[:, None] + (rng.random((num_users, NUM_DAYS)) - 0.5), 1)
+    
+    # Calculate the daily scores for the whole matrix
+    daily_scores = calculate_daily_scores(active_calories, steps, sleep_hours)
+    
+    # Convert to nested lists so the rows hold plain Python numbers
+    active_calories = active_calories.tolist()
+    steps = steps.tolist()
+    sleep_hours = sleep_hours.tolist()
+    daily_scores = daily_scores.tolist()
+    
+    for user_index, user in enumerate(users):
         user_id = user["id"]
         
-        # Generate base metrics with random variation around a typical value
-        base_active_calories = random.randint(250, 450)
-        base_steps = random.randint(3000, 7000)
-        base_sleep = round(random.uniform(6.0, 8.0), 1)
-        
         # Generate data for each day
-        end_date = datetime.datetime.now()
-        for day in range(NUM_DAYS):
-            # Calculate date
-            date = (end_date - datetime.timedelta(days=day)).strftime("%Y-%m-%d")
-            
-            # Add some randomness to the base values
-            day_multiplier = 0.7 + (random.random() * 0.6)  # 0.7 to 1.3
-            active_calories = round(base_active_calories * day_multiplier)
-            
-            # Steps are higher on weekdays, lower on weekends
-            weekday = datetime.datetime.strptime(date, "%Y-%m-%d").weekday()
-            weekend_factor = 0.8 if weekday >= 5 else 1.0  # Weekend = 0.8x
-            steps = int(base_steps * day_multiplier * weekend_factor)
-            
-            # Sleep varies less
-            sleep_hours = round(base_sleep + (random.random() - 0.5), 1)
-            
-            # Calculate the daily score
-            daily_score = calculate_daily_score(active_calories, steps, sleep_hours)
+        for day, date in enumerate(date_strings):
+            record = {
+                "user_id": user_id,
+                "date": date,
+                "active_calories": active_calories[user_index][day],
+                "steps": steps[user_index][day],
+                "sleep_hours": sleep_hours[user_index][day],
+                "daily_score": daily_scores[user_index][day]
+            }
             
-            # Insert into database
-            cursor.execute("""
-                INSERT INTO daily_health_data (user_id, date, active_calories, steps, sleep_hours, daily_score)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (user_id, date, active_calories, steps, sleep_hours, daily_score))
+            # Queue the row for the bulk insert (values are in column order)
+            rows.append(tuple(record.values()))
             
             # Add to our list
-            daily_data.append({
-                "user_id": user_id,
-                "date": date,
-                "active_calories": active_calories,
-                "steps": steps,
-                "sleep_hours": sleep_hours,
-                "daily_score": daily_score
-            })
+            daily_data.append(record)
+    
+    # Insert all daily records in one statement
+    cursor.executemany("""
+        INSERT INTO daily_health_data (user_id, date, active_calories, steps, sleep_hours, daily_score)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, rows)
     
     conn.commit()
-    conn.close()
     
     print(f"Generated {len(daily_data)} daily health records")
     return daily_data
 
-def generate_biomarker_data(users: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def generate_biomarker_data(conn: sqlite3.Connection, users: List[Dict[str, Any]], rng: np.random.Generator) -> List[Dict[str, Any]]:
     """
     Generate biomarker data for each user.
     
     Args:
+        conn: Open connection to the test database
         users: List of user data dictionaries
+        rng: Random number generator
         
     Returns:
         List of biomarker data dictionaries
     """
     biomarker_data = []
-    conn = sqlite3.connect(DB_PATH)
+    rows = []
+    selected = []
     cursor = conn.cursor()
     
+    # Open the transaction explicitly so every insert below is committed together
+    cursor.execute("BEGIN")
+    
+    # All records are dated today
+    today = datetime.date.today().isoformat()
+    
     # Define biomarkers with normal ranges and units
     biomarkers = [
         {"id": "hba1c", "min": 4.0, "max": 6.0, "unit": "%"},
@@ -272,63 +373,62 @@ def generate_biomarker_data(users: List[Dict[str, Any]]) -> List[Dict[str, Any]]
     
     for user in users:
         user_id = user["id"]
-        date = datetime.datetime.now().strftime("%Y-%m-%d")
         
-        # Determine how many biomarkers to generate (different for each user)
-        completeness = random.random()  # 0.0 to 1.0
-        num_biomarkers = math.ceil(completeness * len(biomarkers))
-        selected_biomarkers = random.sample(biomarkers, num_biomarkers)
+        # Determine how many biomarkers to generate (different for each user, at least one)
+        num_biomarkers = rng.integers(1, len(biomarkers), endpoint=True)
+        for item_index in rng.choice(len(biomarkers), size=num_biomarkers, replace=False):
+            selected.append((user_id, today, biomarkers[item_index]))
+    
+    # Generate a value within or slightly outside the normal range for every selection at once
+    values = generate_range_values(rng, [biomarker for _, _, biomarker in selected])
+    
+    for (user_id, date, biomarker), value in zip(selected, values):
+        # Queue the row for the bulk insert
+        rows.append((user_id, date, biomarker["id"], value, biomarker["unit"]))
         
-        for biomarker in selected_biomarkers:
-            # Generate a value within or slightly outside the normal range
-            in_range = random.random() > 0.3  # 70% chance of being in normal range
-            
-            if in_range:
-                value = round(random.uniform(biomarker["min"], biomarker["max"]), 1)
-            else:
-                # Generate a value slightly outside the range
-                higher = random.random() > 0.5
-                if higher:
-                    value = round(biomarker["max"] + random.uniform(0.1, biomarker["max"] * 0.2), 1)
-                else:
-                    value = round(biomarker["min"] - random.uniform(0.1, biomarker["min"] * 0.2), 1)
-                    value = max(0, value)  # Ensure no negative values
-            
-            # Insert into database
-            cursor.execute("""
-                INSERT INTO biomarkers (user_id, date, biomarker_id, value, unit)
-                VALUES (?, ?, ?, ?, ?)
-            """, (user_id, date, biomarker["id"], value, biomarker["unit"]))
-            
-            # Add to our list
-            biomarker_data.append({
-                "user_id": user_id,
-                "date": date,
-                "biomarker_id": biomarker["id"],
-                "value": value,
-                "unit": biomarker["unit"]
-            })
+        # Add to our list
+        biomarker_data.append({
+            "user_id": user_id,
+            "date": date,
+            "biomarker_id": biomarker["id"],
+            "value": value,
+            "unit": biomarker["unit"]
+        })
+    
+    # Insert all biomarker records in one statement
+    cursor.executemany("""
+        INSERT INTO biomarkers (user_id, date, biomarker_id, value, unit)
+        VALUES (?, ?, ?, ?, ?)
+    """, rows)
     
     conn.commit()
-    conn.close()
     
     print(f"Generated {len(biomarker_data)} biomarker records")
     return biomarker_data
 
-def generate_physical_measurement_data(users: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def generate_physical_measurement_data(conn: sqlite3.Connection, users: List[Dict[str, Any]], rng: np.random.Generator) -> List[Dict[str, Any]]:
     """
     Generate physical measurement data for each user.
     
     Args:
+        conn: Open connection to the test database
         users: List of user data dictionaries
+        rng: Random number generator
         
     Returns:
         List of physical measurement data dictionaries
     """
     measurement_data = []
-    conn = sqlite3.connect(DB_PATH)
+    rows = []
+    selected = []
     cursor = conn.cursor()
     
+    # Open the transaction explicitly so every insert below is committed together
+    cursor.execute("BEGIN")
+    
+    # All records are dated today
+    today = datetime.date.today().isoformat()
+    
     # Define physical measurements with normal ranges and units
     measurements = [
         {"id": "body_fat", "min": 10, "max": 25, "unit": "%"},
@@ -342,63 +442,62 @@ def generate_physical_measurement_data(users: List[Dict[str, Any]]) -> List[Dict
     
     for user in users:
         user_id = user["id"]
-        date = datetime.datetime.now().strftime("%Y-%m-%d")
         
-        # Determine how many measurements to generate (different for each user)
-        completeness = random.random()  # 0.0 to 1.0
-        num_measurements = math.ceil(completeness * len(measurements))
-        selected_measurements = random.sample(measurements, num_measurements)
+        # Determine how many measurements to generate (different for each user, at least one)
+        num_measurements = rng.integers(1, len(measurements), endpoint=True)
+        for item_index in rng.choice(len(measurements), size=num_measurements, replace=False):
+            selected.append((user_id, today, measurements[item_index]))
+    
+    # Generate a value within or slightly outside the normal range for every selection at once
+    values = generate_range_values(rng, [measurement for _, _, measurement in selected])
+    
+    for (user_id, date, measurement), value in zip(selected, values):
+        # Queue the row for the bulk insert
+        rows.append((user_id, date, measurement["id"], value, measurement["unit"]))
         
-        for measurement in selected_measurements:
-            # Generate a value within or slightly outside the normal range
-            in_range = random.random() > 0.3  # 70% chance of being in normal range
-            
-            if in_range:
-                value = round(random.uniform(measurement["min"], measurement["max"]), 1)
-            else:
-                # Generate a value slightly outside the range
-                higher = random.random() > 0.5
-                if higher:
-                    value = round(measurement["max"] + random.uniform(0.1, measurement["max"] * 0.2), 1)
-                else:
-                    value = round(measurement["min"] - random.uniform(0.1, measurement["min"] * 0.2), 1)
-                    value = max(0, value)  # Ensure no negative values
-            
-            # Insert into database
-            cursor.execute("""
-                INSERT INTO physical_measurements (user_id, date, measurement_id, value, unit)
-                VALUES (?, ?, ?, ?, ?)
-            """, (user_id, date, measurement["id"], value, measurement["unit"]))
-            
-            # Add to our list
-            measurement_data.append({
-                "user_id": user_id,
-                "date": date,
-                "measurement_id": measurement["id"],
-                "value": value,
-                "unit": measurement["unit"]
-            })
+        # Add to our list
+        measurement_data.append({
+            "user_id": user_id,
+            "date": date,
+            "measurement_id": measurement["id"],
+            "value": value,
+            "unit": measurement["unit"]
+        })
+    
+    # Insert all physical measurement records in one statement
+    cursor.executemany("""
+        INSERT INTO physical_measurements (user_id, date, measurement_id, value, unit)
+        VALUES (?, ?, ?, ?, ?)
+    """, rows)
     
     conn.commit()
-    conn.close()
     
     print(f"Generated {len(measurement_data)} physical measurement records")
     return measurement_data
 
-def generate_functional_test_data(users: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def generate_functional_test_data(conn: sqlite3.Connection, users: List[Dict[str, Any]], rng: np.random.Generator) -> List[Dict[str, Any]]:
     """
     Generate functional test data for each user.
     
     Args:
+        conn: Open connection to the test database
         users: List of user data dictionaries
+        rng: Random number generator
         
     Returns:
         List of functional test data dictionaries
     """
     test_data = []
-    conn = sqlite3.connect(DB_PATH)
+    rows = []
+    selected = []
     cursor = conn.cursor()
     
+    # Open the transaction explicitly so every insert below is committed together
+    cursor.execute("BEGIN")
+    
+    # All records are dated today
+    today = datetime.date.today().isoformat()
+    
     # Define functional tests with ranges and units
     tests = [
         {"id": "push_ups", "min": 10, "max": 30, "unit": "reps"},
@@ -411,82 +510,115 @@ def generate_functional_test_data(users: List[Dict[str, Any]]) -> List[Dict[str,
     
     for user in users:
         user_id = user["id"]
-        date = datetime.datetime.now().strftime("%Y-%m-%d")
         
-        # Determine how many tests to generate (different for each user)
-        completeness = random.random()  # 0.0 to 1.0
-        num_tests = math.ceil(completeness * len(tests))
-        selected_tests = random.sample(tests, num_tests)
+        # Determine how many tests to generate (different for each user, at least one)
+        num_tests = rng.integers(1, len(tests), endpoint=True)
+        for item_index in rng.choice(len(tests), size=num_tests, replace=False):
+            selected.append((user_id, today, tests[item_index]))
+    
+    # Generate a value within or slightly outside the normal range for every selection at once
+    values = generate_range_values(rng, [test for _, _, test in selected])
+    
+    for (user_id, date, test), value in zip(selected, values):
+        # Queue the row for the bulk insert
+        rows.append((user_id, date, test["id"], value, test["unit"]))
         
-        for test in selected_tests:
-            # Generate a value within or slightly outside the normal range
-            in_range = random.random() > 0.3  # 70% chance of being in normal range
-            
-            if in_range:
-                value = round(random.uniform(test["min"], test["max"]), 1)
-            else:
-                # Generate a value slightly outside the range
-                higher = random.random() > 0.5
-                if higher:
-                    value = round(test["max"] + random.uniform(0.1, test["max"] * 0.2), 1)
-                else:
-                    value = round(test["min"] - random.uniform(0.1, test["min"] * 0.2), 1)
-                    value = max(0, value)  # Ensure no negative values
-            
-            # Insert into database
-            cursor.execute("""
-                INSERT INTO functional_tests (user_id, date, test_id, value, unit)
-                VALUES (?, ?, ?, ?, ?)
-            """, (user_id, date, test["id"], value, test["unit"]))
-            
-            # Add to our list
-            test_data.append({
-                "user_id": user_id,
-                "date": date,
-                "test_id": test["id"],
-                "value": value,
-                "unit": test["unit"]
-            })
+        # Add to our list
+        test_data.append({
+            "user_id": user_id,
+            "date": date,
+            "test_id": test["id"],
+            "value": value,
+            "unit": test["unit"]
+        })
+    
+    # Insert all functional test records in one statement
+    cursor.executemany("""
+        INSERT INTO functional_tests (user_id, date, test_id, value, unit)
+        VALUES (?, ?, ?, ?, ?)
+    """, rows)
     
     conn.commit()
-    conn.close()
     
     print(f"Generated {len(test_data)} functional test records")
     return test_data
 
-def save_data_json(data: Dict[str, Any]) -> None:
+def create_indexes(conn: sqlite3.Connection) -> None:
+    """
+    Create the lookup indexes on the per-user tables.
+    
+    Called after all data has been inserted, so each index is built once from
+    the finished table instead of being updated row by row during the load.
+    
+    Args:
+        conn: Open connection to the test database
+    """
+    conn.executescript("""
+        CREATE INDEX IF NOT EXISTS idx_daily_health_data_user_date ON daily_health_data(user_id, date);
+        CREATE INDEX IF NOT EXISTS idx_biomarkers_user ON biomarkers(user_id);
+        CREATE INDEX IF NOT EXISTS idx_physical_measurements_user ON physical_measurements(user_id);
+        CREATE INDEX IF NOT EXISTS idx_functional_tests_user ON functional_tests(user_id);
+    """)
+    
+    print("Created indexes")
+
+def save_data_json(data: Dict[str, Any], pretty: bool = False) -> None:
     """
     Save all generated data to a JSON file for reference.
     
     Args:
         data: Dictionary of all generated data
+        pretty: Indent the output for reading instead of writing it compactly
     """
     with open("data/test_data.json", 'w') as f:
-        json.dump(data, f, indent=2)
+        if pretty:
+            json.dump(data, f, indent=2)
+        else:
+            json.dump(data, f, separators=(",", ":"))
     
     print(f"Saved all data to data/test_data.json")
 
+def parse_args() -> argparse.Namespace:
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(description="Generate test data for the Bio Age Coach application.")
+    parser.add_argument("--pretty", action="store_true", help="write data/test_data.json with indentation")
+    parser.add_argument("--seed", type=int, default=None, help="seed for reproducible data (random by default)")
+    return parser.parse_args()
+
 def main():
     """Main function to orchestrate test data generation."""
+    args = parse_args()
+    
     print("Generating test data for Bio Age Coach...")
     
     # Create the database and schema
     create_database()
     
-    # Generate user data
-    users = generate_user_data()
-    
-    # Generate daily health data
-    daily_data = generate_daily_health_data(users)
-    
-    # Generate biomarker data
-    biomarker_data = generate_biomarker_data(users)
+    # One random generator drives all of the data, so a seed reproduces the whole set
+    rng = np.random.default_rng(args.seed)
     
-    # Generate physical measurement data
-    measurement_data = generate_physical_measurement_data(users)
-    
-    # Generate functional test data
-    test_data = generate_functional_test_data(users)
+    # Share one connection across all generators
+    conn = connect_database()
+    try:
+        # Generate user data
+        users = generate_user_data(conn, rng)
+        
+        # Generate daily health data
+        daily_data = generate_daily_health_data(conn, users, rng)
+        
+        # Generate biomarker data
+        biomarker_data = generate_biomarker_data(conn, users, rng)
+        
+        # Generate physical measurement data
+        measurement_data = generate_physical_measurement_data(conn, users, rng)
+        
+        # Generate functional test data
+        test_data = generate_functional_test_data(conn, users, rng)
+        
+        # Index the tables now that the bulk load is done
+        create_indexes(conn)
+    finally:
+        conn.close()
     
     # Save all data to a JSON file
     all_data = {
@@ -496,7 +628,7 @@ def main():
         "measurements": measurement_data,
         "functional_tests": test_data
     }
-    save_data_json(all_data)
+    save_data_json(all_data, pretty=args.pretty)
     
     print("Test data generation complete!")
 
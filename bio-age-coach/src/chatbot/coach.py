@@ -4,10 +4,14 @@ Core implementation of the BioAgeCoach chatbot.
 
 import json
 import os
-from typing import Dict, List, Optional, Tuple, Any
-from openai import OpenAI
+import re
+import functools
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple, Any
 from dotenv import load_dotenv
 
+if TYPE_CHECKING:
+    from openai import OpenAI
+
 from .prompts import (
     SYSTEM_PROMPT,
     BIOMARKER_ASSESSMENT_PROMPT,
@@ -26,8 +30,92 @@ from .prompts import (
 # Load environment variables
 load_dotenv()
 
-# Initialize OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# Maximum number of user/assistant messages kept after the system prompt
+MAX_HISTORY_MESSAGES = 20
+
+# Categories of collected user data, in display order
+USER_DATA_CATEGORIES = (
+    "health_data",
+    "bio_age_tests",
+    "capabilities",
+    "biomarkers",
+    "measurements",
+    "lab_results"
+)
+
+# Category weights for overall completeness calculation (shared, read-only)
+CATEGORY_WEIGHTS = {
+    "health_data": 0.15,
+    "bio_age_tests": 0.15,
+    "capabilities": 0.10,
+    "biomarkers": 0.25,
+    "measurements": 0.15,
+    "lab_results": 0.20
+}
+
+# Keyword matchers for _update_state, compiled once: each scans the lower-cased
+# input in a single pass instead of one substring test per word
+_HABIT_KEYWORDS_RE = re.compile("habit|exercise|diet")
+_MOTIVATION_KEYWORDS_RE = re.compile("why|goal|motivation")
+
+# Bulleted ("-" or "*") lines of a message; one findall replaces a split and
+# per-line strip/startswith loop
+_BULLET_RE = re.compile(r"^\s*[-*](.*)$", re.MULTILINE)
+
+# Prompt for each conversation stage that always gets one ("assessment" is
+# handled separately because it also depends on the data collected so far)
+_STAGE_PROMPTS = {
+    "recommendations": PROTOCOL_RECOMMENDATION_PROMPT,
+    "motivation": MOTIVATION_EXPLORATION_PROMPT,
+    "plan": PLAN_CREATION_PROMPT,
+    "resources": RESOURCES_RECOMMENDATION_PROMPT,
+}
+
+
+@functools.lru_cache(maxsize=8)
+def _parse_json_file(path: str, mtime: float) -> Dict:
+    """Parse a JSON file; cached per modification time so edits are picked up."""
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_client() -> "OpenAI":
+    """
+    Return the shared OpenAI client, creating it on first use.
+    
+    The openai package is imported here rather than at module level so that
+    starting the app and building a coach do not pay for it until the first
+    message is sent. All coaches share the one client and its connection pool.
+    """
+    from openai import OpenAI
+    return OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+
+
+def _empty_user_data() -> Dict[str, Dict]:
+    """Return a fresh, empty user data structure with one dict per category."""
+    return {category: {} for category in USER_DATA_CATEGORIES}
+
+
+def _bullet_items(text: str) -> List[str]:
+    """Return the stripped text of every bulleted line in a message."""
+    return [item.strip() for item in _BULLET_RE.findall(text)]
+
+
+def load_json_data(path: str) -> Dict:
+    """
+    Load a reference data file, parsing it only once per process.
+    
+    Every session creates its own coach, so the parsed data is shared between
+    them and must be treated as read-only.
+    
+    Args:
+        path: Path to the JSON file
+        
+    Returns:
+        The parsed JSON data
+    """
+    return _parse_json_file(path, os.path.getmtime(path))
 
 
 class BioAgeCoach:
@@ -39,23 +127,14 @@ class BioAgeCoach:
     
     def __init__(self):
         """Initialize the Bio Age Coach."""
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
         self.messages = []
         
         # Initialize empty user data structure
-        self.user_data = {
-            "health_data": {},
-            "bio_age_tests": {},
-            "capabilities": {},
-            "biomarkers": {},
-            "measurements": {},
-            "lab_results": {}
-        }
+        self.user_data = _empty_user_data()
         
         # Load biomarkers data
         try:
-            with open("data/biomarkers.json", "r") as f:
-                self.biomarkers = json.load(f)
+            self.biomarkers = load_json_data("data/biomarkers.json")
         except Exception as e:
             print(f"Error loading data/biomarkers.json: {e}")
             # Use default biomarkers if file can't be loaded
@@ -91,12 +170,14 @@ class BioAgeCoach:
         
         # Load protocols data
         try:
-            with open("data/protocols.json", "r") as f:
-                self.protocols = json.load(f)
+            self.protocols = load_json_data("data/protocols.json")
         except Exception as e:
             print(f"Error loading data/protocols.json: {e}")
             self.protocols = {"protocols": []}
         
+        # Index biomarker names and ids so lookups don't scan every category
+        self.biomarker_index = self._build_biomarker_index()
+        
         # Initialize conversation state
         self.user_habits = []
         self.user_motivations = []
@@ -104,29 +185,20 @@ class BioAgeCoach:
         self.conversation_stage = "introduction"
         
         # Category weights for overall completeness calculation
-        self.category_weights = {
-            "health_data": 0.15,
-            "bio_age_tests": 0.15,
-            "capabilities": 0.10,
-            "biomarkers": 0.25,
-            "measurements": 0.15,
-            "lab_results": 0.20
-        }
+        self.category_weights = CATEGORY_WEIGHTS
         
         # Add system message
         self.messages.append({"role": "system", "content": SYSTEM_PROMPT})
         
+    @property
+    def client(self) -> "OpenAI":
+        """The shared OpenAI client, created when the first request is made."""
+        return _get_client()
+    
     def reset(self):
         """Reset the conversation state."""
         self.messages = [{"role": "system", "content": SYSTEM_PROMPT}]
-        self.user_data = {
-            "health_data": {},
-            "bio_age_tests": {},
-            "capabilities": {},
-            "biomarkers": {},
-            "measurements": {},
-            "lab_results": {}
-        }
+        self.user_data = _empty_user_data()
         self.user_habits = []
         self.user_motivations = []
         self.recommended_protocols = []
@@ -142,6 +214,74 @@ class BioAgeCoach:
         Returns:
             The coach's response
         """
+        messages_with_prompt = self._prepare_messages(user_input)
+        
+        # Get response from OpenAI using the new API format
+        response = self.client.chat.completions.create(
+            model="gpt-4",
+            messages=messages_with_prompt,
+            temperature=0.7,
+            max_tokens=800
+        )
+        
+        # Extract response - updated for the new API format
+        assistant_response = response.choices[0].message.content
+        
+        self._record_response(assistant_response)
+        return assistant_response
+    
+    def stream_response(self, user_input: str) -> Iterator[str]:
+        """
+        Stream a response from the Bio-Age coach as it is generated.
+        
+        The response is added to the message history when the stream ends,
+        exactly as get_response does. If the stream is cut short (e.g. Streamlit
+        stops the script on a rerun), the text received so far is recorded; if
+        nothing arrived, the pending user turn is dropped so the history never
+        holds two user turns in a row.
+        
+        Args:
+            user_input: The text input from the user
+            
+        Yields:
+            Chunks of the coach's response text
+        """
+        messages_with_prompt = self._prepare_messages(user_input)
+        
+        stream = self.client.chat.completions.create(
+            model="gpt-4",
+            messages=messages_with_prompt,
+            temperature=0.7,
+            max_tokens=800,
+            stream=True
+        )
+        
+        chunks = []
+        try:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    chunks.append(delta)
+                    yield delta
+        finally:
+            stream.close()
+            if chunks:
+                self._record_response("".join(chunks))
+            else:
+                self.messages.pop()
+    
+    def _prepare_messages(self, user_input: str) -> List[Dict[str, str]]:
+        """
+        Record the user's message, update state and build the API message list.
+        
+        Args:
+            user_input: The text input from the user
+            
+        Returns:
+            The messages to send to the chat completions API
+        """
         # Add user message to history
         self.messages.append({"role": "user", "content": user_input})
         
@@ -155,8 +295,9 @@ class BioAgeCoach:
             # Get next prompt based on conversation stage
             next_prompt = self._get_stage_prompt()
         
-        # Create system prompt with current user data
-        system_prompt = SYSTEM_PROMPT + "\n\nCurrent user data:\n" + json.dumps(self.user_data, indent=2)
+        # Create system prompt with current user data (compact JSON: it is rebuilt
+        # every turn, and indentation only adds serialization work and tokens)
+        system_prompt = SYSTEM_PROMPT + "\n\nCurrent user data:\n" + json.dumps(self.user_data, separators=(",", ":"))
         
         # Update system message with current data
         self.messages[0] = {"role": "system", "content": system_prompt}
@@ -165,26 +306,31 @@ class BioAgeCoach:
         if next_prompt:
             # If we have a specific prompt for this stage, use it
             prompt_msg = {"role": "system", "content": next_prompt}
-            messages_with_prompt = self.messages + [prompt_msg]
-        else:
-            # Otherwise use the existing messages
-            messages_with_prompt = self.messages
-        
-        # Get response from OpenAI using the new API format
-        response = self.client.chat.completions.create(
-            model="gpt-4",
-            messages=messages_with_prompt,
-            temperature=0.7,
-            max_tokens=800
-        )
+            return self.messages + [prompt_msg]
         
-        # Extract response - updated for the new API format
-        assistant_response = response.choices[0].message.content
+        # Otherwise use the existing messages
+        return self.messages
+    
+    def _record_response(self, assistant_response: str) -> None:
+        """
+        Add the assistant's response to the message history.
         
-        # Add response to message history
+        Args:
+            assistant_response: The full text of the coach's response
+        """
         self.messages.append({"role": "assistant", "content": assistant_response})
+        self._trim_history()
+    
+    def _trim_history(self) -> None:
+        """
+        Drop the oldest conversation messages beyond MAX_HISTORY_MESSAGES.
         
-        return assistant_response
+        The system message at index 0 is always kept. Bounding the history keeps
+        both memory use and the size of each API request constant over long sessions.
+        """
+        excess = len(self.messages) - 1 - MAX_HISTORY_MESSAGES
+        if excess > 0:
+            del self.messages[1:1 + excess]
     
     def _update_state(self, user_input: str) -> None:
         """
@@ -199,14 +345,15 @@ class BioAgeCoach:
         Args:
             user_input: The user's message
         """
+        # Lower-case the message once for all of the keyword checks below
+        user_input_lower = user_input.lower()
+        
         # Try to extract biomarker data
-        self._extract_user_data(user_input)
+        self._extract_user_data(user_input, user_input_lower)
         
         # Extract habits (simplified for demo)
-        if "habit" in user_input.lower() or "exercise" in user_input.lower() or "diet" in user_input.lower():
-            for line in user_input.split('\n'):
-                if line.strip().startswith('-') or line.strip().startswith('*'):
-                    self.user_habits.append(line.strip()[1:].strip())
+        if _HABIT_KEYWORDS_RE.search(user_input_lower):
+            self.user_habits.extend(_bullet_items(user_input))
         
         # Update conversation stage based on content and current stage
         if self.conversation_stage == "introduction":
@@ -216,39 +363,56 @@ class BioAgeCoach:
                 self.conversation_stage = "habits"
                 
         elif self.conversation_stage == "assessment":
-            if "why" in user_input.lower() or "goal" in user_input.lower() or "motivation" in user_input.lower():
+            if _MOTIVATION_KEYWORDS_RE.search(user_input_lower):
                 self.conversation_stage = "motivation"
                 
         # Continue updating stages as conversation progresses...
     
-    def _extract_user_data(self, text: str) -> None:
+    def _extract_user_data(self, text: str, text_lower: str) -> None:
         """
         Extract health data from user input and categorize it.
         
         Args:
             text: User input text
+            text_lower: The same text, lower-cased
         """
         # Check for structured biomarker input
-        if "my biomarker values" in text.lower():
-            lines = text.split('\n')
-            for line in lines:
-                if line.strip().startswith('-') or line.strip().startswith('*'):
-                    parts = line.strip()[1:].strip().split(':')
-                    if len(parts) == 2:
-                        name, value_str = parts[0].strip(), parts[1].strip()
-                        
-                        # Extract numeric value and unit
-                        value_parts = value_str.split()
-                        if len(value_parts) > 0:
-                            try:
-                                value = float(value_parts[0])
-                                # Find which category this biomarker belongs to
-                                category, item_id = self._find_biomarker_category(name)
-                                if category and item_id:
-                                    self.user_data[category][item_id] = value
-                            except ValueError:
-                                # Not a numeric value, skip
-                                pass
+        if "my biomarker values" in text_lower:
+            for item in _bullet_items(text):
+                parts = item.split(':')
+                if len(parts) == 2:
+                    name, value_str = parts[0].strip(), parts[1].strip()
+                    
+                    # Extract numeric value and unit
+                    value_parts = value_str.split()
+                    if len(value_parts) > 0:
+                        try:
+                            value = float(value_parts[0])
+                            # Find which category this biomarker belongs to
+                            category, item_id = self._find_biomarker_category(name)
+                            if category and item_id:
+                                self.user_data[category][item_id] = value
+                        except ValueError:
+                            # Not a numeric value, skip
+                            pass
+    
+    def _build_biomarker_index(self) -> Dict[str, Tuple[str, str]]:
+        """
+        Build a lookup from lower-cased biomarker names and ids to their location.
+        
+        When several items share a name or id, the first one in category order
+        wins, matching the original linear search.
+        
+        Returns:
+            Dictionary mapping a lower-cased name or id to (category_key, item_id)
+        """
+        index = {}
+        for category_key, category_data in self.biomarkers.get("categories", {}).items():
+            for item in category_data.get("items", []):
+                location = (category_key, item.get("id"))
+                index.setdefault(item.get("name", "").lower(), location)
+                index.setdefault(item.get("id", "").lower(), location)
+        return index
     
     def _find_biomarker_category(self, name: str) -> Tuple[Optional[str], Optional[str]]:
         """
@@ -260,14 +424,7 @@ class BioAgeCoach:
         Returns:
             Tuple of (category_key, item_id) if found, (None, None) otherwise
         """
-        name_lower = name.lower()
-        
-        for category_key, category_data in self.biomarkers.get("categories", {}).items():
-            for item in category_data.get("items", []):
-                if name_lower == item.get("name", "").lower() or name_lower == item.get("id", "").lower():
-                    return category_key, item.get("id")
-        
-        return None, None
+        return self.biomarker_index.get(name.lower(), (None, None))
     
     def _get_stage_prompt(self) -> Optional[str]:
         """
@@ -276,18 +433,10 @@ class BioAgeCoach:
         Returns:
             Prompt text or None if no specific prompt is needed
         """
-        if self.conversation_stage == "assessment" and self.has_sufficient_data_for_assessment():
-            return BIOMARKER_ASSESSMENT_PROMPT
-        elif self.conversation_stage == "recommendations":
-            return PROTOCOL_RECOMMENDATION_PROMPT
-        elif self.conversation_stage == "motivation":
-            return MOTIVATION_EXPLORATION_PROMPT
-        elif self.conversation_stage == "plan":
-            return PLAN_CREATION_PROMPT
-        elif self.conversation_stage == "resources":
-            return RESOURCES_RECOMMENDATION_PROMPT
-        
-        return None
+        if self.conversation_stage == "assessment":
+            return BIOMARKER_ASSESSMENT_PROMPT if self.has_sufficient_data_for_assessment() else None
+        
+        return _STAGE_PROMPTS.get(self.conversation_stage)
     
     def has_sufficient_data_for_assessment(self) -> bool:
         """
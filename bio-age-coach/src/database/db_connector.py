@@ -7,10 +7,45 @@ and retrieve user health data for the Bio Age Coach.
 
 import os
 import sqlite3
+import logging
 import datetime
 import random
 from typing import Dict, List, Any, Optional, Tuple
 
+logger = logging.getLogger(__name__)
+
+# Daily health fields that are averaged for summaries, with their rounding precision
+DAILY_AVERAGE_FIELDS = {
+    "active_calories": 1,
+    "steps": 0,
+    "sleep_hours": 1,
+    "daily_score": 1
+}
+
+
+def average_daily_health(daily_data: List[Dict[str, Any]]) -> Dict[str, float]:
+    """
+    Average the summary fields of a list of daily health records.
+    
+    All fields are accumulated in a single pass over the records.
+    
+    Args:
+        daily_data: List of daily health data dictionaries
+        
+    Returns:
+        Dictionary of rounded averages keyed by field name (zeros if there are no records)
+    """
+    totals = dict.fromkeys(DAILY_AVERAGE_FIELDS, 0)
+    for record in daily_data:
+        for field in DAILY_AVERAGE_FIELDS:
+            totals[field] += record[field]
+    
+    count = len(daily_data) or 1
+    return {
+        field: round(totals[field] / count, digits)
+        for field, digits in DAILY_AVERAGE_FIELDS.items()
+    }
+
 
 class DatabaseConnector:
     """
@@ -73,14 +108,30 @@ class DatabaseConnector:
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
+        user_info = self._fetch_user_info(cursor, user_id)
+        
+        conn.close()
+        
+        return user_info
+    
+    @staticmethod
+    def _fetch_user_info(cursor: sqlite3.Cursor, user_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a user's information using an existing cursor.
+        
+        Args:
+            cursor: Cursor on a connection with row_factory set to sqlite3.Row
+            user_id: ID of the user to retrieve
+            
+        Returns:
+            Dictionary with user information or None if user not found
+        """
         cursor.execute(
             "SELECT id, username, email, chronological_age, biological_sex, created_at FROM users WHERE id = ?", 
             (user_id,)
         )
         row = cursor.fetchone()
         
-        conn.close()
-        
         if row:
             return dict(row)
         return None
@@ -222,8 +273,8 @@ class DatabaseConnector:
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
-        # Get user info
-        user_info = self.get_user_info(user_id)
+        # Get user info (on this connection rather than via get_user_info, which opens its own)
+        user_info = self._fetch_user_info(cursor, user_id)
         
         # Get daily health data
         cursor.execute("""
@@ -293,25 +344,11 @@ class DatabaseConnector:
         
         conn.close()
         
-        # Calculate averages from daily data if available
-        if daily_data:
-            avg_calories = sum(d['active_calories'] for d in daily_data) / len(daily_data)
-            avg_steps = sum(d['steps'] for d in daily_data) / len(daily_data)
-            avg_sleep = sum(d['sleep_hours'] for d in daily_data) / len(daily_data)
-            avg_score = sum(d['daily_score'] for d in daily_data) / len(daily_data)
-        else:
-            avg_calories = avg_steps = avg_sleep = avg_score = 0
-        
         return {
             "user_info": user_info,
             "daily_data": {
                 "records": daily_data,
-                "averages": {
-                    "active_calories": round(avg_calories, 1),
-                    "steps": round(avg_steps, 0),
-                    "sleep_hours": round(avg_sleep, 1),
-                    "daily_score": round(avg_score, 1)
-                }
+                "averages": average_daily_health(daily_data)
             },
             "biomarkers": biomarkers,
             "bio_age_tests": bio_age_tests,
@@ -367,9 +404,10 @@ class DatabaseConnector:
                 # Daily health data is handled specially due to multiple days
                 if "daily_health" in categories_to_use:
                     days_to_include = int(14 * completion)
+                    daily_rows = []
                     for days_ago in range(days_to_include):
                         date = today - datetime.timedelta(days=days_ago)
-                        daily_data = (
+                        daily_rows.append((
                             user_id,
                             date,
                             random.uniform(300, 500),  # active_calories
@@ -379,14 +417,14 @@ class DatabaseConnector:
                             random.randint(110, 130),  # blood_pressure_systolic
                             random.randint(70, 85),  # blood_pressure_diastolic
                             random.uniform(70, 95)  # daily_score
-                        )
-                        cursor.execute("""
-                            INSERT INTO daily_health 
-                            (user_id, date, active_calories, steps, sleep_hours, 
-                             resting_heart_rate, blood_pressure_systolic, 
-                             blood_pressure_diastolic, daily_score)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """, daily_data)
+                        ))
+                    cursor.executemany("""
+                        INSERT INTO daily_health 
+                        (user_id, date, active_calories, steps, sleep_hours, 
+                         resting_heart_rate, blood_pressure_systolic, 
+                         blood_pressure_diastolic, daily_score)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """, daily_rows)
                 
                 # Add biomarkers
                 if "biomarkers" in categories_to_use:
@@ -443,6 +481,15 @@ class CoachDataMapper:
     Maps database records to the Bio-Age Coach data model.
     """
     
+    # Fields copied as-is from each database record category to the coach category
+    CATEGORY_FIELDS = {
+        "biomarkers": ("hba1c", "hdl", "ldl", "triglycerides", "crp", "fasting_glucose"),
+        "bio_age_tests": ("push_ups", "grip_strength", "one_leg_stand", "vo2_max"),
+        "measurements": ("body_fat", "waist_circumference", "hip_circumference", "waist_to_hip"),
+        "capabilities": ("plank", "sit_and_reach"),
+        "lab_results": ("vitamin_d",)
+    }
+    
     @staticmethod
     def map_data_to_coach_format(data: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
         """
@@ -489,40 +536,13 @@ class CoachDataMapper:
                     coach_data["health_data"]["blood_pressure_systolic"] = latest["blood_pressure_systolic"]
                     coach_data["health_data"]["blood_pressure_diastolic"] = latest["blood_pressure_diastolic"]
         
-        # Map biomarkers
-        if "biomarkers" in data:
-            biomarkers = data["biomarkers"]
-            for field in ["hba1c", "hdl", "ldl", "triglycerides", "crp", "fasting_glucose"]:
-                if field in biomarkers and biomarkers[field] is not None:
-                    coach_data["biomarkers"][field] = biomarkers[field]
-        
-        # Map bio-age tests
-        if "bio_age_tests" in data:
-            tests = data["bio_age_tests"]
-            for field in ["push_ups", "grip_strength", "one_leg_stand", "vo2_max"]:
-                if field in tests and tests[field] is not None:
-                    coach_data["bio_age_tests"][field] = tests[field]
-        
-        # Map measurements
-        if "measurements" in data:
-            measurements = data["measurements"]
-            for field in ["body_fat", "waist_circumference", "hip_circumference", "waist_to_hip"]:
-                if field in measurements and measurements[field] is not None:
-                    coach_data["measurements"][field] = measurements[field]
-        
-        # Map capabilities
-        if "capabilities" in data:
-            capabilities = data["capabilities"]
-            for field in ["plank", "sit_and_reach"]:
-                if field in capabilities and capabilities[field] is not None:
-                    coach_data["capabilities"][field] = capabilities[field]
-        
-        # Map lab results
-        if "lab_results" in data:
-            lab_results = data["lab_results"]
-            for field in ["vitamin_d"]:
-                if field in lab_results and lab_results[field] is not None:
-                    coach_data["lab_results"][field] = lab_results[field]
+        # Copy the known, non-null fields of each record category
+        for category, fields in CoachDataMapper.CATEGORY_FIELDS.items():
+            record = data.get(category)
+            if record:
+                coach_data[category].update(
+                    (field, record[field]) for field in fields if record.get(field) is not None
+                )
         
         return coach_data
 
@@ -545,8 +565,9 @@ def initialize_coach_with_user_data(coach, db: DatabaseConnector, user_id: int)
     # Map database data to coach format
     coach_data = CoachDataMapper.map_data_to_coach_format(user_data)
     
-    # Debug: print the mapped data to see what's going into the coach
-    print(f"Mapped coach data: {coach_data}")
+    # Debug: log the mapped data to see what's going into the coach. The %s
+    # formatting is lazy, so the dict is only stringified when DEBUG is enabled.
+    logger.debug("Mapped coach data: %s", coach_data)
     
     # Update coach's user_data
     for category, data in coach_data.items():
@@ -8,6 +8,50 @@ import sqlite3
 from datetime import datetime, timedelta
 import random
 
+# Sample rows inserted into a new database. Per-table rows are keyed by user id and
+# are stamped with the current date at insert time.
+SAMPLE_USERS = (
+    (1, "John Smith", "john@example.com", 35, "male"),
+    (2, "Emma Davis", "emma@example.com", 55, "female"),
+    (3, "Michael Chen", "michael@example.com", 45, "male")
+)
+
+SAMPLE_BIOMARKERS = (
+    (1, 5.2, 58.4, 81.0, 135.0, 0.3, 72.4),
+    (2, 5.4, 66.4, 92.0, 128.0, 0.4, 75.0),
+    (3, 5.1, 62.0, 88.0, 142.0, 0.2, 70.0)
+)
+
+SAMPLE_MEASUREMENTS = (
+    (1, 29.4, 77.8, 96.0, 0.81),
+    (2, 8.0, 57.3, 102.4, 0.7),
+    (3, 18.5, 82.0, 98.0, 0.84)
+)
+
+SAMPLE_BIO_AGE_TESTS = (
+    (1, 25, 95.0, 45.0, 35.0),
+    (2, 34, 85.0, 38.0, 32.0),
+    (3, 30, 90.0, 42.0, 38.0)
+)
+
+SAMPLE_CAPABILITIES = (
+    (1, 26.5, None),
+    (2, 84.7, 0.1),
+    (3, 45.0, 0.2)
+)
+
+SAMPLE_LAB_RESULTS = (
+    (1, None),
+    (2, 26.0),
+    (3, 32.0)
+)
+
+
+def _with_date(rows, date):
+    """Insert the given date after the user id of each sample row."""
+    return [(user_id, date, *values) for user_id, *values in rows]
+
+
 def init_database(db_path="data/test_database.db"):
     """Initialize the database with tables and sample data."""
     # Ensure data directory exists
@@ -99,20 +143,16 @@ def init_database(db_path="data/test_database.db"):
     c.execute("SELECT COUNT(*) FROM users")
     if c.fetchone()[0] == 0:
         # Insert sample users with age and sex
-        sample_users = [
-            (1, "John Smith", "john@example.com", 35, "male"),
-            (2, "Emma Davis", "emma@example.com", 55, "female"),
-            (3, "Michael Chen", "michael@example.com", 45, "male")
-        ]
-        c.executemany("INSERT INTO users (id, username, email, chronological_age, biological_sex) VALUES (?, ?, ?, ?, ?)", sample_users)
+        c.executemany("INSERT INTO users (id, username, email, chronological_age, biological_sex) VALUES (?, ?, ?, ?, ?)", SAMPLE_USERS)
         
         # Generate sample daily health data for last 14 days
         today = datetime.now().date()
+        daily_rows = []
         for user_id in [1, 2, 3]:
             for days_ago in range(14):
                 date = today - timedelta(days=days_ago)
                 # Generate realistic but varying health data
-                daily_data = (
+                daily_rows.append((
                     user_id,
                     date,
                     random.uniform(300, 500),  # active_calories
@@ -122,74 +162,49 @@ def init_database(db_path="data/test_database.db"):
                     random.randint(110, 130),  # blood_pressure_systolic
                     random.randint(70, 85),  # blood_pressure_diastolic
                     random.uniform(70, 95)  # daily_score
-                )
-                c.execute("""
-                    INSERT INTO daily_health 
-                    (user_id, date, active_calories, steps, sleep_hours, 
-                     resting_heart_rate, blood_pressure_systolic, 
-                     blood_pressure_diastolic, daily_score)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, daily_data)
+                ))
+        c.executemany("""
+            INSERT INTO daily_health 
+            (user_id, date, active_calories, steps, sleep_hours, 
+             resting_heart_rate, blood_pressure_systolic, 
+             blood_pressure_diastolic, daily_score)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, daily_rows)
         
         # Insert sample biomarker data
-        sample_biomarkers = [
-            (1, today, 5.2, 58.4, 81.0, 135.0, 0.3, 72.4),
-            (2, today, 5.4, 66.4, 92.0, 128.0, 0.4, 75.0),
-            (3, today, 5.1, 62.0, 88.0, 142.0, 0.2, 70.0)
-        ]
         c.executemany("""
             INSERT INTO biomarkers 
             (user_id, date, hba1c, hdl, ldl, triglycerides, crp, fasting_glucose)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, sample_biomarkers)
+        """, _with_date(SAMPLE_BIOMARKERS, today))
         
         # Insert sample measurements
-        sample_measurements = [
-            (1, today, 29.4, 77.8, 96.0, 0.81),
-            (2, today, 8.0, 57.3, 102.4, 0.7),
-            (3, today, 18.5, 82.0, 98.0, 0.84)
-        ]
         c.executemany("""
             INSERT INTO measurements 
             (user_id, date, body_fat, waist_circumference, hip_circumference, waist_to_hip)
             VALUES (?, ?, ?, ?, ?, ?)
-        """, sample_measurements)
+        """, _with_date(SAMPLE_MEASUREMENTS, today))
         
         # Insert sample bio-age tests
-        sample_tests = [
-            (1, today, 25, 95.0, 45.0, 35.0),
-            (2, today, 34, 85.0, 38.0, 32.0),
-            (3, today, 30, 90.0, 42.0, 38.0)
-        ]
         c.executemany("""
             INSERT INTO bio_age_tests 
             (user_id, date, push_ups, grip_strength, one_leg_stand, vo2_max)
             VALUES (?, ?, ?, ?, ?, ?)
-        """, sample_tests)
+        """, _with_date(SAMPLE_BIO_AGE_TESTS, today))
         
         # Insert sample capabilities
-        sample_capabilities = [
-            (1, today, 26.5, None),
-            (2, today, 84.7, 0.1),
-            (3, today, 45.0, 0.2)
-        ]
         c.executemany("""
             INSERT INTO capabilities 
             (user_id, date, plank, sit_and_reach)
             VALUES (?, ?, ?, ?)
-        """, sample_capabilities)
+        """, _with_date(SAMPLE_CAPABILITIES, today))
         
         # Insert sample lab results
-        sample_lab_results = [
-            (1, today, None),
-            (2, today, 26.0),
-            (3, today, 32.0)
-        ]
         c.executemany("""
             INSERT INTO lab_results 
             (user_id, date, vitamin_d)
             VALUES (?, ?, ?)
-        """, sample_lab_results)
+        """, _with_date(SAMPLE_LAB_RESULTS, today))
     
     conn.commit()
     conn.close()